@@ -1,2 +1,12 @@
-from .gcd import GCDAnalyser, GCDData, get_GCDData
-from .utils import ordinal
+from .gcd import (
+    CycleFeatureExtractor,
+    GCDAnalyser,
+    GCDData,
+    IngestService,
+    attach_GCDAnalyser,
+    attach_GCDData,
+    get_GCDData,
+    publish_GCDData,
+    render_figures,
+)
+from .utils import Profiler, ordinal
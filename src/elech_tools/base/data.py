@@ -1,16 +1,117 @@
+import numpy as np
 import pandas as pd
 
+from ..utils.profiler import NULL_STAGE, Profiler
+from ..utils.search import Search, SearchDateTime
+
 
 class BaseData:
-    def __init__(self, file_path) -> None:
+    def __init__(self, file_path, profiler: Profiler | None = None) -> None:
         self.file_path: str = file_path
         self.df: pd.DataFrame = None
+        self.profiler: Profiler | None = profiler
+        self._searches: dict[str, tuple[np.ndarray, pd.Index, Search]] = {}
 
         try:
-            self.load()
+            with self.profile("load") as stage:
+                self.load()
+                rows = None if self.df is None else len(self.df)
+                stage.rows = rows
         except Exception as e:
             raise DataValidationException(e)
+        with self.profile("validate", rows=rows):
+            self.validate()
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, file_path=None):
+        """
+        ファイルを読み込まずに, 作成済みの DataFrame からインスタンスを作成します.
+        validate は通常どおり行います.
+
+        ----------
+        Parameters
+        df: pandas.DataFrame
+        file_path: str | None
+            元のファイルパス. 記録用です.
+        """
+        self = cls.__new__(cls)
+        self.file_path = file_path
+        self.df = df
+        self.profiler = None
+        self._searches = {}
         self.validate()
+        return self
+
+    def __getstate__(self):
+        # profiler はプロセス内での計測用なので pickle しない
+        state = self.__dict__.copy()
+        state["profiler"] = None
+        state["_searches"] = {}
+        return state
+
+    def search(self, column: str) -> Search:
+        """
+        指定した列の Search を返します.
+        作成した Search は列ごとにキャッシュし, 列のデータが変わっていなければ
+        並べ替えの順序を再計算せずに使い回します.
+        列や df の置き換えは, 配列のメモリ領域と index が同じかどうかで検出します.
+        値は比較しないため, 同じメモリ領域をその場で書き換えた場合は
+        `invalidate_search` を呼んでください.
+
+        ----------
+        Parameters
+        column: str
+            列名. datetime型の列では SearchDateTime を返します.
+
+        Return
+        Search
+        """
+        series = self.df[column]
+        values = series.to_numpy()
+        cached = self._searches.get(column)
+        if (
+            cached is not None
+            and cached[1] is self.df.index
+            and _same_array(cached[0], values)
+        ):
+            return cached[2]
+
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            search = SearchDateTime(series)
+        else:
+            search = Search(series)
+        self._searches[column] = (values, self.df.index, search)
+        return search
+
+    def invalidate_search(self, column: str | None = None):
+        """
+        `search` でキャッシュした Search を破棄します.
+
+        ----------
+        Parameters
+        column: str | None
+            破棄する列名. Noneのときは全ての列を破棄します.
+        """
+        if column is None:
+            self._searches.clear()
+        else:
+            self._searches.pop(column, None)
+
+    def profile(self, name: str, rows: int | None = None):
+        """
+        ステージの計測を行うコンテキストマネージャを返します.
+        profiler が指定されていないときは何もしません.
+
+        ----------
+        Parameters
+        name: str
+            ステージ名. クラス名を前置して記録されます.
+        rows: int | None
+            処理行数
+        """
+        if self.profiler is None:
+            return NULL_STAGE
+        return self.profiler.stage(f"{type(self).__name__}.{name}", rows=rows)
 
     def load(self):
         pass
@@ -21,3 +122,14 @@ class BaseData:
 
 class DataValidationException(Exception):
     pass
+
+
+def _same_array(a: np.ndarray, b: np.ndarray) -> bool:
+    """
+    2つの配列が同じメモリ領域を同じ形で参照しているかを返します.
+    """
+    return (
+        a.dtype == b.dtype
+        and a.shape == b.shape
+        and a.__array_interface__["data"][0] == b.__array_interface__["data"][0]
+    )
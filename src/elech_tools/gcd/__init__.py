@@ -1,2 +1,6 @@
 from .analyser import GCDAnalyser
 from .data import GCDData, get_GCDData
+from .features import CycleFeatureExtractor
+from .ingest import IngestResult, IngestService
+from .render import RenderResult, render_figures
+from .shared import attach_GCDAnalyser, attach_GCDData, publish_GCDData
@@ -1,7 +1,12 @@
+import itertools
 from typing import Literal
 
+import numpy as np
+import pandas as pd
 from matplotlib.axes import Axes
 
+from ..base import DataValidationException
+from ..utils.profiler import NULL_STAGE, Profiler
 from .data import GCDData
 
 Mode = Literal["Charge", "Discharge"]
@@ -9,23 +14,116 @@ ModeAll = Literal["Rest", "Charge", "Discharge"]
 
 
 class GCDAnalyser:
-    def __init__(self, data: GCDData) -> None:
+    def __init__(
+        self,
+        data: GCDData,
+        profiler: Profiler | None = None,
+        step_table: pd.DataFrame | None = None,
+    ) -> None:
+        """
+        ----------
+        Parameters
+        data: GCDData
+        profiler: Profiler | None
+            計測に使うプロファイラ. Noneのときは data.profiler を使います.
+        step_table: pandas.DataFrame | None
+            `build_step_table` で作成したステップ表. 作成済みの場合に指定すると
+            data.df の走査を省略します.
+        """
         self.data: GCDData = data
+        self.profiler: Profiler | None = (
+            profiler if profiler is not None else getattr(data, "profiler", None)
+        )
         self.steps: list[list[tuple(tuple(int, int), ModeAll)]] = []
         self._discharges: list[tuple(int, int)] = []
         self._charges: list[tuple(int, int)] = []
-        for cycle_index, cycle in self.data.df.groupby("cycle"):
-            mode_in_steps: list[Mode] = []
-            for step_index, step in cycle.groupby("step"):
-                mode = step["mode"].iat[0]
-                mode_in_steps.append(((cycle_index, step_index), mode))
-                if mode == "Discharge":
-                    self._discharges.append((cycle_index, step_index))
-                elif mode == "Charge":
-                    self._charges.append((cycle_index, step_index))
-                else:
-                    pass
-            self.steps.append(mode_in_steps)
+        with self.profile("index", rows=len(self.data.df)):
+            if step_table is None:
+                step_table = self.build_step_table(self.data.df)
+            self.step_table: pd.DataFrame = step_table
+
+            for cycle_index, cycle in itertools.groupby(
+                zip(
+                    step_table["cycle"].tolist(),
+                    step_table["step"].tolist(),
+                    step_table["mode"].tolist(),
+                ),
+                key=lambda row: row[0],
+            ):
+                mode_in_steps: list[Mode] = []
+                for _, step_index, mode in cycle:
+                    mode_in_steps.append(((cycle_index, step_index), mode))
+                    if mode == "Discharge":
+                        self._discharges.append((cycle_index, step_index))
+                    elif mode == "Charge":
+                        self._charges.append((cycle_index, step_index))
+                    else:
+                        pass
+                self.steps.append(mode_in_steps)
+
+    @staticmethod
+    def build_step_table(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        (cycle, step) ごとに1行のステップ表を作成します.
+        行は cycle, step の昇順に並びます.
+
+        ----------
+        Parameters
+        df: pandas.DataFrame
+            GCDData.df
+
+        Return
+        pandas.DataFrame
+            cycle: サイクル番号
+            step: ステップ番号
+            mode: ステップ最初の行の動作モード
+            start: ステップ最初の行の位置
+            stop: ステップ最後の行の位置 + 1
+
+        (cycle, step) の行が連続していない場合は start:stop で切り出せないため,
+        DataValidationException を送出します.
+        """
+        positions = (
+            pd.DataFrame(
+                {
+                    "cycle": df["cycle"].to_numpy(),
+                    "step": df["step"].to_numpy(),
+                    "position": np.arange(len(df)),
+                }
+            )
+            .groupby(["cycle", "step"], sort=True)["position"]
+            .agg(["min", "max", "count"])
+        )
+        scattered = positions["max"] - positions["min"] + 1 != positions["count"]
+        if scattered.any():
+            cycle, step = positions.index[scattered.to_numpy()][0]
+            raise DataValidationException(
+                f"rows of cycle {cycle}, step {step} are not contiguous"
+            )
+        start = positions["min"].to_numpy()
+        return pd.DataFrame(
+            {
+                "cycle": positions.index.get_level_values("cycle").to_numpy(),
+                "step": positions.index.get_level_values("step").to_numpy(),
+                "mode": df["mode"].iloc[start].to_numpy(),
+                "start": start,
+                "stop": positions["max"].to_numpy() + 1,
+            }
+        ).astype({"mode": "string"})
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["profiler"] = None
+        return state
+
+    def profile(self, name: str, rows: int | None = None):
+        """
+        ステージの計測を行うコンテキストマネージャを返します.
+        profiler が指定されていないときは何もしません.
+        """
+        if self.profiler is None:
+            return NULL_STAGE
+        return self.profiler.stage(f"{type(self).__name__}.{name}", rows=rows)
 
     def get_index(self, cycle: int, mode: Literal["Charge", "Discharge"]):
         """
@@ -70,7 +168,12 @@ class GCDAnalyser:
         return self.data.df.groupby(["cycle", "step"]).get_group(index)
 
     def plot_charge_discharge(
-        self, ax: Axes, cycle: int, mode: Literal["Charge", "Discharge"], **kwargs
+        self,
+        ax: Axes,
+        cycle: int,
+        mode: Literal["Charge", "Discharge"],
+        decimate: int = 1,
+        **kwargs,
     ):
         """
         指定されたサイクルの充放電曲線をプロットします
@@ -84,6 +187,9 @@ class GCDAnalyser:
             10 => 10th サイクル
         mode: Literal["Charge", "Discharge"]
             充放電モード。Restは無視するため、指定できません。
+        decimate: int = 1
+            間引き間隔です. n を指定すると n 点ごとに1点をプロットします.
+            デフォルトは1(間引きなし)です.
         **kwargs: プロットの設定です. axes.plotへ代入されます.
             color, labelなどが設定可です. 詳しくは
             https://matplotlib.org/stable/api/_as_gen/matplotlib.axes.Axes.plot.html
@@ -91,7 +197,8 @@ class GCDAnalyser:
         Return
         matplotlib.axes.Axes
         """
-        df = self.get_df(cycle=cycle, mode=mode)
+        _check_decimate(decimate)
+        df = self.get_df(cycle=cycle, mode=mode).iloc[::decimate]
         x = df["capacity [mAh g-1]"]
         y = df["potential [V]"]
 
@@ -106,6 +213,7 @@ class GCDAnalyser:
         index_start: int | None = None,
         index_end: int | None = None,
         time_unit: Literal["s", "m", "h"] = "s",
+        decimate: int = 1,
         **kwargs,
     ):
         """
@@ -122,6 +230,9 @@ class GCDAnalyser:
         time_unit: Literal["s", "m", "h"] = "s"
             横軸の時間の単位です. 秒(s), 分(m), 時(h)のいずれかが指定できます.
             デフォルトは秒(s)です.
+        decimate: int = 1
+            間引き間隔です. n を指定すると n 点ごとに1点をプロットします.
+            デフォルトは1(間引きなし)です.
         **kwargs: プロットの設定です. axes.plotへ代入されます.
             color, labelなどが設定可です. 詳しくは
             https://matplotlib.org/stable/api/_as_gen/matplotlib.axes.Axes.plot.html
@@ -130,12 +241,13 @@ class GCDAnalyser:
         matplotlib.axes.Axes
         """
 
+        _check_decimate(decimate)
         df = self.data.df
         if index_start is None:
             index_start = df.index[0]
         if index_end is None:
             index_end = df.index[-1]
-        df = df.loc[index_start:index_end]
+        df = df.loc[index_start:index_end].iloc[::decimate]
         if time_unit == "s":
             x = df["time [sec]"]
         elif time_unit == "m":
@@ -151,3 +263,42 @@ class GCDAnalyser:
         ax.set_ylabel("Potential / V")
 
         return ax
+
+    def plot_capacity_by_cycle(
+        self, ax: Axes, mode: Literal["Charge", "Discharge"] = "Discharge", **kwargs
+    ):
+        """
+        サイクルごとの容量(各ステップの最大容量)をプロットします.
+
+        ----------
+        Parameters
+        ax: matplotlib.axes.Axes
+        mode: Literal["Charge", "Discharge"] = "Discharge"
+            充放電モード。Restは指定できません。
+        **kwargs: プロットの設定です. axes.plotへ代入されます.
+            color, labelなどが設定可です. 詳しくは
+            https://matplotlib.org/stable/api/_as_gen/matplotlib.axes.Axes.plot.html
+
+        Return
+        matplotlib.axes.Axes
+        """
+        if mode == "Charge":
+            indexes = self._charges
+        elif mode == "Discharge":
+            indexes = self._discharges
+        else:
+            raise Exception("Rest Mode can not be specified.")
+
+        capacities = self.data.df.groupby(["cycle", "step"])["capacity [mAh g-1]"].max()
+        x = range(1, len(indexes) + 1)
+        y = capacities.loc[indexes].to_numpy()
+
+        ax.plot(x, y, **kwargs)
+        ax.set_xlabel("Cycle number")
+        ax.set_ylabel(r"Capacity / $\mathrm{mAh\,g^{-1}}$")
+        return ax
+
+
+def _check_decimate(decimate: int):
+    if decimate < 1:
+        raise ValueError(f"decimate must be 1 or greater, but {decimate} was given.")
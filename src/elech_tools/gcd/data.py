@@ -1,28 +1,31 @@
 import csv
 import datetime
 import io
+import os
+from typing import Iterable
 
 import numpy as np
 import pandas as pd
 
 from ..base import BaseData, DataValidationException
+from ..utils.profiler import Profiler
+
+COLUMNS = {
+    "datetime": "datetime64[ms]",
+    "time [sec]": "float64",
+    "potential [V]": "float64",
+    "capacity [mAh]": "float64",
+    "capacity [mAh g-1]": "float64",
+    "cycle": "int32",
+    "step": "int32",
+    "mode": "string",
+}
 
 
 class GCDData(BaseData):
     def validate(self):
         super().validate()
-        expected_columns = {
-            "datetime": "datetime64[ms]",
-            "time [sec]": "float64",
-            "potential [V]": "float64",
-            "capacity [mAh]": "float64",
-            "capacity [mAh g-1]": "float64",
-            "cycle": "int32",
-            "step": "int32",
-            "mode": "string",
-        }
-
-        for column, dtype in expected_columns.items():
+        for column, dtype in COLUMNS.items():
             if column not in self.df.columns:
                 raise DataValidationException(f"{column} is not in self.df.columns")
             if self.df[column].dtype != dtype:
@@ -31,6 +34,95 @@ class GCDData(BaseData):
                     f"but found {self.df[column].dtype}."
                 )
 
+    @classmethod
+    def merge(cls, sources: "Iterable[GCDData | str | os.PathLike]") -> "GCDData":
+        """
+        中断・再開により複数に分かれた測定データを1つにまとめます.
+        データは測定開始日時の順に並べ替え, 2つ目以降のデータの
+        time [sec], cycle をそれまでのデータに続くようにずらします.
+        step はサイクルごとに振り直されている場合はそのままにし,
+        サイクルをまたいで通し番号になっている場合のみずらします.
+        測定開始日時が前のデータの測定終了日時より前のデータがある場合は,
+        DataValidationException を送出します.
+        GCDAnalyser はまとめた後のデータに対して1度だけ作成してください.
+
+        ----------
+        Parameters
+        sources: Iterable[GCDData | str | os.PathLike]
+            GCDData またはファイルパス. ファイルパスは `get_GCDData` で読み込みます.
+
+        Return
+        GCDData
+            呼び出したクラスのインスタンス. file_path は最初のデータのものになります.
+        """
+        datas = [
+            source if isinstance(source, GCDData) else get_GCDData(os.fspath(source))
+            for source in sources
+        ]
+        if len(datas) == 0:
+            raise DataValidationException("No data to merge.")
+
+        # 測定開始日時が全て分かる場合のみ並べ替える
+        starts = [
+            data.df["datetime"].iat[0] if len(data.df) else pd.NaT for data in datas
+        ]
+        has_datetime = not any(pd.isna(start) for start in starts)
+        if has_datetime:
+            order = sorted(range(len(datas)), key=lambda i: starts[i])
+            datas = [datas[i] for i in order]
+            starts = [starts[i] for i in order]
+        dfs = [data.df for data in datas]
+        if has_datetime:
+            for i in range(1, len(dfs)):
+                if starts[i] < dfs[i - 1]["datetime"].iat[-1]:
+                    raise DataValidationException(
+                        f"{datas[i].file_path} starts at {starts[i]}, before "
+                        f"{datas[i - 1].file_path} ends at "
+                        f"{dfs[i - 1]['datetime'].iat[-1]}."
+                    )
+        lengths = np.array([len(df) for df in dfs])
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+
+        # 1回の確保で全体の列を作り, 各データの値を書き込む
+        columns = {}
+        for column, dtype in COLUMNS.items():
+            if isinstance(dfs[0][column].dtype, np.dtype):
+                array = np.empty(bounds[-1], dtype=dfs[0][column].dtype)
+                for df, start, stop in zip(dfs, bounds[:-1], bounds[1:]):
+                    array[start:stop] = df[column].to_numpy()
+                columns[column] = array
+            else:
+                array = np.empty(bounds[-1], dtype=object)
+                for df, start, stop in zip(dfs, bounds[:-1], bounds[1:]):
+                    array[start:stop] = df[column].to_numpy(dtype=object)
+                columns[column] = pd.array(array, dtype=dtype)
+
+        # time [sec] は最初のデータの time [sec] と日時の対応に合わせる.
+        # 日時が分からない場合は前のデータの最後の時間だけずらす
+        if has_datetime:
+            first_times = [df["time [sec]"].iat[0] for df in dfs]
+            time_offsets = np.array(
+                [
+                    (start - starts[0]).total_seconds() - first_time + first_times[0]
+                    for start, first_time in zip(starts, first_times)
+                ]
+            )
+        else:
+            last_times = [df["time [sec]"].iat[-1] if len(df) else 0.0 for df in dfs]
+            time_offsets = np.concatenate([[0.0], np.cumsum(last_times)[:-1]])
+        columns["time [sec]"] += np.repeat(time_offsets, lengths)
+
+        offset_columns = ["cycle"]
+        if _has_global_steps(dfs):
+            offset_columns.append("step")
+        for column in offset_columns:
+            last = [df[column].max() if len(df) else 0 for df in dfs]
+            offsets = np.concatenate([[0], np.cumsum(last)[:-1]])
+            columns[column] += np.repeat(offsets, lengths).astype(COLUMNS[column])
+
+        df = pd.DataFrame(columns, copy=False)
+        return cls.from_dataframe(df, file_path=datas[0].file_path)
+
 
 class SD8Data(GCDData):
     """
@@ -40,7 +132,9 @@ class SD8Data(GCDData):
     def load(self):
         headerRow: int
         started_at: datetime.datetime | None = None
-        with open(self.file_path, mode="rt", encoding="shift_jis") as file:
+        with self.profile("header"), open(
+            self.file_path, mode="rt", encoding="shift_jis"
+        ) as file:
             for i, line in enumerate(file.readlines()):
                 if "測定開始日時" in line:
                     text = line.replace("測定開始日時,", "").replace("\n", "")
@@ -50,23 +144,25 @@ class SD8Data(GCDData):
                     break
                 if i > 30:
                     raise DataValidationException("ヘッダー行が検出できませんでした")
-        df = pd.read_csv(
-            self.file_path,
-            header=headerRow + 1,
-            usecols=[0, 1, 4, 5, 10, 11, 12],
-            names=["時間", "電圧", "Ah(Step)", "Ah/g(Step)", "サイクル", "ステップ", "モード"],
-            dtype={
-                "時間": "float64",
-                "電圧": "float64",
-                "Ah(Step)": "float64",
-                "Ah/g(Step)": "float64",
-                "サイクル": "int32",
-                "ステップ": "int32",
-                "モード": "string",
-            },
-            encoding="shift_jis",
-            skip_blank_lines=True,
-        )
+        with self.profile("read_csv") as stage:
+            df = pd.read_csv(
+                self.file_path,
+                header=headerRow + 1,
+                usecols=[0, 1, 4, 5, 10, 11, 12],
+                names=["時間", "電圧", "Ah(Step)", "Ah/g(Step)", "サイクル", "ステップ", "モード"],
+                dtype={
+                    "時間": "float64",
+                    "電圧": "float64",
+                    "Ah(Step)": "float64",
+                    "Ah/g(Step)": "float64",
+                    "サイクル": "int32",
+                    "ステップ": "int32",
+                    "モード": "string",
+                },
+                encoding="shift_jis",
+                skip_blank_lines=True,
+            )
+            stage.rows = len(df)
         df.columns = [
             "time [sec]",
             "potential [V]",
@@ -76,23 +172,27 @@ class SD8Data(GCDData):
             "step",
             "mode",
         ]
-        if started_at is not None:
-            df["datetime"] = started_at + pd.to_timedelta(df["time [sec]"], unit="s")
-        else:
-            df["datetime"] = None
-
-        df = df.astype(
-            dtype={
-                "time [sec]": "float64",
-                "datetime": "datetime64[ms]",
-                "potential [V]": "float64",
-                "capacity [mAh]": "float64",
-                "capacity [mAh g-1]": "float64",
-                "cycle": "int32",
-                "step": "int32",
-                "mode": "string",
-            }
-        )
+        with self.profile("datetime", rows=len(df)):
+            if started_at is not None:
+                df["datetime"] = started_at + pd.to_timedelta(
+                    df["time [sec]"], unit="s"
+                )
+            else:
+                df["datetime"] = None
+
+        with self.profile("astype", rows=len(df)):
+            df = df.astype(
+                dtype={
+                    "time [sec]": "float64",
+                    "datetime": "datetime64[ms]",
+                    "potential [V]": "float64",
+                    "capacity [mAh]": "float64",
+                    "capacity [mAh g-1]": "float64",
+                    "cycle": "int32",
+                    "step": "int32",
+                    "mode": "string",
+                }
+            )
         self.df = df
 
 
@@ -102,7 +202,9 @@ class BiologicData(GCDData):
     """
 
     def load(self):
-        df = pd.read_csv(self.file_path, sep="\t")
+        with self.profile("read_csv") as stage:
+            df = pd.read_csv(self.file_path, sep="\t")
+            stage.rows = len(df)
         df = df.rename(
             columns={
                 "mode": "measure_mode",
@@ -118,26 +220,31 @@ class BiologicData(GCDData):
         df.loc[(df["current [mA]"] < 0.0), "mode"] = "Discharge"
         df.loc[(df["current [mA]"] > 0.0), "mode"] = "Charge"
 
-        df["datetime"] = pd.to_datetime(df["datetime"], format="%m/%d/%Y %H:%M:%S.%f")
-        start = df["datetime"].iat[0]
-        df["time [sec]"] = (df["datetime"] - start).dt.total_seconds()
-
-        df = df.astype(
-            dtype={
-                "datetime": "datetime64[ms]",
-                "potential [V]": "float64",
-                "capacity [mAh]": "float64",
-                "cycle": "int32",
-                "mode": "string",
-            }
-        )
-
-        for cycle, cycle_df in df.groupby("cycle"):
-            df.loc[(df["cycle"] == cycle), "step"] = (
-                cycle_df["mode"] != cycle_df["mode"].shift()
-            ).cumsum()
-
-        df.loc[df["step"].isna(), "step"] = 0
+        with self.profile("datetime", rows=len(df)):
+            df["datetime"] = pd.to_datetime(
+                df["datetime"], format="%m/%d/%Y %H:%M:%S.%f"
+            )
+            start = df["datetime"].iat[0]
+            df["time [sec]"] = (df["datetime"] - start).dt.total_seconds()
+
+        with self.profile("astype", rows=len(df)):
+            df = df.astype(
+                dtype={
+                    "datetime": "datetime64[ms]",
+                    "potential [V]": "float64",
+                    "capacity [mAh]": "float64",
+                    "cycle": "int32",
+                    "mode": "string",
+                }
+            )
+
+        with self.profile("step", rows=len(df)):
+            for cycle, cycle_df in df.groupby("cycle"):
+                df.loc[(df["cycle"] == cycle), "step"] = (
+                    cycle_df["mode"] != cycle_df["mode"].shift()
+                ).cumsum()
+
+            df.loc[df["step"].isna(), "step"] = 0
 
         df["cycle"] = df["cycle"] + 1
         df["step"] = df["step"] + 1
@@ -154,18 +261,19 @@ class BiologicData(GCDData):
             ]
         ]
         df["capacity [mAh g-1]"] = None
-        df = df.astype(
-            dtype={
-                "time [sec]": "float64",
-                "datetime": "datetime64[ms]",
-                "potential [V]": "float64",
-                "capacity [mAh]": "float64",
-                "capacity [mAh g-1]": "float64",
-                "cycle": "int32",
-                "step": "int32",
-                "mode": "string",
-            }
-        )
+        with self.profile("astype", rows=len(df)):
+            df = df.astype(
+                dtype={
+                    "time [sec]": "float64",
+                    "datetime": "datetime64[ms]",
+                    "potential [V]": "float64",
+                    "capacity [mAh]": "float64",
+                    "capacity [mAh g-1]": "float64",
+                    "cycle": "int32",
+                    "step": "int32",
+                    "mode": "string",
+                }
+            )
         self.df = df
 
 
@@ -177,7 +285,9 @@ class HZ7000Data(GCDData):
 
     def load(self):
         # 最初の5行を読み込む
-        with open(self.file_path, mode="rt", encoding="shift_jis") as file:
+        with self.profile("header"), open(
+            self.file_path, mode="rt", encoding="shift_jis"
+        ) as file:
             blocks = file.read().split("《測定フェイズヘッダ》")
             include, exclude = blocks[-1].split("《解析データヘッダ》")  # 最後にくっついてる余分な分を取り除く
             blocks[-1] = include
@@ -202,17 +312,19 @@ class HZ7000Data(GCDData):
             if "自然電位測定" in block.split("\n")[1]:
                 # 自然電位測定
                 # header でheader行数を取得している
-                df = pd.read_csv(
-                    io.StringIO(block),
-                    header=header - 3,
-                    usecols=[1, 2],
-                    names=["time [sec]", "potential [V]"],
-                    dtype={
-                        "time [sec]": float,
-                        "potential [V]": float,
-                    },
-                    encoding="shift_jis",
-                )
+                with self.profile("read_csv") as stage:
+                    df = pd.read_csv(
+                        io.StringIO(block),
+                        header=header - 3,
+                        usecols=[1, 2],
+                        names=["time [sec]", "potential [V]"],
+                        dtype={
+                            "time [sec]": float,
+                            "potential [V]": float,
+                        },
+                        encoding="shift_jis",
+                    )
+                    stage.rows = len(df)
                 df["datetime"] = started_at + pd.to_timedelta(
                     df["time [sec]"], unit="s"
                 )
@@ -225,30 +337,32 @@ class HZ7000Data(GCDData):
 
             elif "本測定" in block.split("\n")[1]:
                 # 充放電測定
-                df = pd.read_csv(
-                    io.StringIO(block),
-                    header=header - 3,
-                    usecols=[1, 2, 3, 5, 6, 7, 8],
-                    names=[
-                        "time [sec]",
-                        "potential [V]",
-                        "current [A]",
-                        "+Q [C]",
-                        "-Q [C]",
-                        "Sigma Q [C]",
-                        "mode",
-                    ],
-                    dtype={
-                        "time [sec]": float,
-                        "potential [V]": float,
-                        "current [A]": float,
-                        "+Q [C]": float,
-                        "-Q [C]": float,
-                        "Sigma Q [C]": float,
-                        "mode": object,
-                    },
-                    encoding="shift_jis",
-                )
+                with self.profile("read_csv") as stage:
+                    df = pd.read_csv(
+                        io.StringIO(block),
+                        header=header - 3,
+                        usecols=[1, 2, 3, 5, 6, 7, 8],
+                        names=[
+                            "time [sec]",
+                            "potential [V]",
+                            "current [A]",
+                            "+Q [C]",
+                            "-Q [C]",
+                            "Sigma Q [C]",
+                            "mode",
+                        ],
+                        dtype={
+                            "time [sec]": float,
+                            "potential [V]": float,
+                            "current [A]": float,
+                            "+Q [C]": float,
+                            "-Q [C]": float,
+                            "Sigma Q [C]": float,
+                            "mode": object,
+                        },
+                        encoding="shift_jis",
+                    )
+                    stage.rows = len(df)
                 df["datetime"] = started_at + pd.to_timedelta(
                     df["time [sec]"], unit="s"
                 )
@@ -260,7 +374,8 @@ class HZ7000Data(GCDData):
                 )
 
                 # ステップ数を書き出す
-                df["step"] = (df["mode"] != df["mode"].shift()).cumsum()
+                with self.profile("step", rows=len(df)):
+                    df["step"] = (df["mode"] != df["mode"].shift()).cumsum()
 
                 # 充放電容量を書き出す
                 # 放電は -Q [C] を利用する
@@ -285,24 +400,45 @@ class HZ7000Data(GCDData):
                     ]
                 )
 
-        self.df = pd.concat(df_list, ignore_index=True).astype(
-            dtype={
-                "time [sec]": "float64",
-                "datetime": "datetime64[ms]",
-                "potential [V]": "float64",
-                "capacity [mAh]": "float64",
-                "capacity [mAh g-1]": "float64",
-                "cycle": "int32",
-                "step": "int32",
-                "mode": "string",
-            }
-        )
-
-
-def get_GCDData(file_path: str) -> GCDData:
+        with self.profile("concat") as stage:
+            df = pd.concat(df_list, ignore_index=True)
+            stage.rows = len(df)
+        with self.profile("astype", rows=len(df)):
+            self.df = df.astype(
+                dtype={
+                    "time [sec]": "float64",
+                    "datetime": "datetime64[ms]",
+                    "potential [V]": "float64",
+                    "capacity [mAh]": "float64",
+                    "capacity [mAh g-1]": "float64",
+                    "cycle": "int32",
+                    "step": "int32",
+                    "mode": "string",
+                }
+            )
+
+
+def _has_global_steps(dfs: list[pd.DataFrame]) -> bool:
+    """
+    step がサイクルをまたいで通し番号になっているかを返します.
+    サイクルが変わるところで step が1度も戻らず, かつ判定できる
+    サイクルの境目が1つ以上ある場合にTrueです.
+    """
+    boundaries = 0
+    for df in dfs:
+        cycle = df["cycle"].to_numpy()
+        step = df["step"].to_numpy()
+        changed = np.flatnonzero(cycle[1:] != cycle[:-1]) + 1
+        if np.any(step[changed] <= step[changed - 1]):
+            return False
+        boundaries += len(changed)
+    return boundaries > 0
+
+
+def get_GCDData(file_path: str, profiler: Profiler | None = None) -> GCDData:
     def try_parse(gcddata: GCDData):
         try:
-            result = gcddata(file_path)
+            result = gcddata(file_path, profiler=profiler)
             return result
         except DataValidationException as e:
             return None
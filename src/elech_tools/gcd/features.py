@@ -0,0 +1,205 @@
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from ..utils import file_stem
+from .analyser import GCDAnalyser
+
+
+class CycleFeatureExtractor:
+    """
+    複数のセルの GCDAnalyser から, サイクル寿命予測用の特徴量を計算します.
+    各セルの放電容量と放電曲線は最初に使うときに1度だけ取り出してキャッシュするため,
+    特徴量を追加で計算しても元の DataFrame は再び走査しません.
+
+    ----------
+    Parameters
+    analysers: Iterable[GCDAnalyser] | Mapping[str, GCDAnalyser]
+        Mappingのときはキーをセル名にします.
+        それ以外は data.file_path のファイル名(拡張子なし)をセル名にします.
+    column: str = "capacity [mAh]"
+        容量として使う列
+    """
+
+    def __init__(
+        self,
+        analysers: Iterable[GCDAnalyser] | Mapping[str, GCDAnalyser],
+        column: str = "capacity [mAh]",
+    ) -> None:
+        if isinstance(analysers, Mapping):
+            self.names: list[str] = [str(name) for name in analysers.keys()]
+            self.analysers: list[GCDAnalyser] = list(analysers.values())
+        else:
+            self.analysers = list(analysers)
+            self.names = [
+                file_stem(analyser.data.file_path, default=str(i))
+                for i, analyser in enumerate(self.analysers)
+            ]
+        self.column = column
+        self._capacities: np.ndarray | None = None
+        self._curves: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def capacities(self) -> np.ndarray:
+        """
+        放電容量の行列 (セル数 × 最大サイクル数) です.
+        各放電ステップの容量の最大値で, サイクルが無いところはNaNです.
+        他の特徴量の計算に使い回すため, 読み取り専用です.
+        """
+        if self._capacities is None:
+            per_cell = [
+                self._discharge_capacities(analyser) for analyser in self.analysers
+            ]
+            cycles = max((len(capacity) for capacity in per_cell), default=0)
+            matrix = np.full((len(per_cell), cycles), np.nan)
+            for i, capacity in enumerate(per_cell):
+                matrix[i, : len(capacity)] = capacity
+            matrix.flags.writeable = False
+            self._capacities = matrix
+        return self._capacities
+
+    def capacity(self, cycle: int) -> np.ndarray:
+        """
+        指定サイクルの放電容量をセルごとに返します.
+
+        ----------
+        Parameters
+        cycle: int
+            放電のサイクル数. 1始まり
+
+        Return
+        numpy.ndarray (セル数,)
+        """
+        _check_cycle(cycle)
+        capacities = self.capacities
+        if cycle > capacities.shape[1]:
+            return np.full(len(self.analysers), np.nan)
+        # キャッシュを書き換えられないようにコピーを返す
+        return capacities[:, cycle - 1].copy()
+
+    def fade_slope(self, first: int = 2, last: int = 100) -> np.ndarray:
+        """
+        first から last サイクルまでの放電容量を直線近似した傾き(容量/サイクル)を
+        セルごとに返します. 2点未満のセルはNaNです.
+
+        Return
+        numpy.ndarray (セル数,)
+        """
+        _check_cycle(first)
+        y = self.capacities[:, first - 1 : last]
+        x = np.broadcast_to(np.arange(first, first + y.shape[1], dtype=float), y.shape)
+        valid = ~np.isnan(y)
+        count = valid.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = np.where(valid, x, 0.0).sum(axis=1) / count
+            y_mean = np.where(valid, y, 0.0).sum(axis=1) / count
+            dx = np.where(valid, x - x_mean[:, None], 0.0)
+            dy = np.where(valid, y - y_mean[:, None], 0.0)
+            slope = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+        slope[count < 2] = np.nan
+        return slope
+
+    def delta_q_variance(
+        self, cycle_a: int = 10, cycle_b: int = 100, points: int = 1000
+    ) -> np.ndarray:
+        """
+        放電曲線の容量差 ΔQ(V) = Q_b(V) - Q_a(V) の分散をセルごとに返します.
+        電位は2つの放電曲線で共通する範囲を points 点に分割します.
+        どちらかのサイクルが無いセルはNaNです.
+
+        Return
+        numpy.ndarray (セル数,)
+        """
+        _check_cycle(cycle_a)
+        _check_cycle(cycle_b)
+        variances = np.full(len(self.analysers), np.nan)
+        for i in range(len(self.analysers)):
+            curve_a = self._discharge_curve(i, cycle_a)
+            curve_b = self._discharge_curve(i, cycle_b)
+            if curve_a is None or curve_b is None:
+                continue
+            low = max(curve_a[0][0], curve_b[0][0])
+            high = min(curve_a[0][-1], curve_b[0][-1])
+            if not low < high:
+                continue
+            grid = np.linspace(low, high, points)
+            delta = np.interp(grid, *curve_b) - np.interp(grid, *curve_a)
+            variances[i] = np.var(delta)
+        return variances
+
+    def extract(
+        self,
+        capacity_cycles: Iterable[int] = (2, 100),
+        delta_q_cycles: tuple[int, int] | None = (10, 100),
+        fade_cycles: tuple[int, int] | None = (2, 100),
+    ) -> pd.DataFrame:
+        """
+        特徴量の行列 (セル × 特徴量) を返します.
+
+        ----------
+        Parameters
+        capacity_cycles: Iterable[int] = (2, 100)
+            放電容量を特徴量にするサイクル. 列名は capacity_{サイクル}
+        delta_q_cycles: tuple[int, int] | None = (10, 100)
+            ΔQ(V) の分散を計算する2つのサイクル. 列名は delta_q_variance_{a}_{b}
+            Noneのときは計算しません.
+        fade_cycles: tuple[int, int] | None = (2, 100)
+            容量の傾きを計算するサイクルの範囲. 列名は fade_slope_{first}_{last}
+            Noneのときは計算しません.
+
+        Return
+        pandas.DataFrame
+            index はセル名です.
+        """
+        features = {}
+        for cycle in capacity_cycles:
+            features[f"capacity_{cycle}"] = self.capacity(cycle)
+        if delta_q_cycles is not None:
+            a, b = delta_q_cycles
+            features[f"delta_q_variance_{a}_{b}"] = self.delta_q_variance(a, b)
+        if fade_cycles is not None:
+            first, last = fade_cycles
+            features[f"fade_slope_{first}_{last}"] = self.fade_slope(first, last)
+        return pd.DataFrame(features, index=pd.Index(self.names, name="cell"))
+
+    def _discharge_steps(self, analyser: GCDAnalyser) -> pd.DataFrame:
+        table = analyser.step_table
+        return table[(table["mode"] == "Discharge").fillna(False)]
+
+    def _discharge_capacities(self, analyser: GCDAnalyser) -> np.ndarray:
+        steps = self._discharge_steps(analyser)
+        if len(steps) == 0:
+            return np.empty(0)
+        # 末尾にNaNを足し, [start, stop) ごとの最大値を reduceat でまとめて計算する
+        capacity = np.append(
+            analyser.data.df[self.column].to_numpy(dtype=float), np.nan
+        )
+        indices = np.column_stack([steps["start"], steps["stop"]]).ravel()
+        return np.fmax.reduceat(capacity, indices)[::2]
+
+    def _discharge_curve(
+        self, cell: int, cycle: int
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        放電曲線を電位の昇順に並べた (電位, 容量) を返します.
+        """
+        _check_cycle(cycle)
+        key = (cell, cycle)
+        if key not in self._curves:
+            analyser = self.analysers[cell]
+            steps = self._discharge_steps(analyser)
+            if cycle > len(steps):
+                return None
+            start, stop = steps[["start", "stop"]].iloc[cycle - 1]
+            df = analyser.data.df
+            potential = df["potential [V]"].to_numpy()[start:stop]
+            capacity = df[self.column].to_numpy(dtype=float)[start:stop]
+            order = np.argsort(potential, kind="stable")
+            self._curves[key] = (potential[order], capacity[order])
+        return self._curves[key]
+
+
+def _check_cycle(cycle: int):
+    if cycle < 1:
+        raise ValueError(f"cycle must be 1 or greater, but {cycle} was given.")
@@ -0,0 +1,276 @@
+import asyncio
+import fnmatch
+import inspect
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable
+
+from .analyser import GCDAnalyser
+from .data import GCDData, get_GCDData
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestResult:
+    """
+    1ファイルの取り込み結果です.
+
+    path: ファイルパス
+    data: 読み込んだ GCDData
+    analyser: GCDAnalyser. analyse=False のときはNone
+    parse_seconds: 読み込みと解析にかかった時間 [s]
+    latency: ファイルを検出してから読み込みが終わるまでの時間 [s]
+    queue_depth: 取り出した時点で待ち行列に残っていたファイル数
+    """
+
+    path: str
+    data: GCDData
+    analyser: GCDAnalyser | None
+    parse_seconds: float
+    latency: float
+    queue_depth: int
+
+
+Callback = Callable[[IngestResult], Awaitable[None] | None]
+ErrorCallback = Callable[[str, BaseException], Awaitable[None] | None]
+
+
+class IngestService:
+    """
+    ディレクトリを監視し, 書き込みが終わった測定ファイルを読み込んで callback に渡します.
+
+    ファイルの大きさと更新時刻が settle_time 秒変化しなければ書き込み完了とみなします.
+    読み込みは executor 上で最大 max_workers 件ずつ並行して行い,
+    待ち行列が max_queue 件に達すると空くまで監視を止めます.
+
+    ----------
+    Parameters
+    directory: str | os.PathLike
+        監視するディレクトリ
+    callback: Callable[[IngestResult], Awaitable[None] | None]
+        読み込みが終わるたびに呼ばれます. コルーチン関数も指定できます.
+    on_error: Callable[[str, BaseException], Awaitable[None] | None] | None
+        読み込みに失敗したときに (パス, 例外) で呼ばれます.
+        Noneのときはログに出力します.
+    parser: Callable[[str], GCDData] = get_GCDData
+        ファイルを読み込む関数. ProcessPoolExecutor を使う場合は pickle できる必要があります.
+    analyse: bool = True
+        Trueのとき GCDAnalyser も作成します.
+    patterns: Iterable[str] = ("*",)
+        対象とするファイル名のパターン. "."で始まるファイルは常に無視します.
+    poll_interval: float = 1.0
+        ディレクトリを走査する間隔 [s]
+    settle_time: float = 2.0
+        書き込み完了とみなすまでの時間 [s]
+    max_workers: int = 4
+        同時に読み込むファイル数
+    max_queue: int = 100
+        読み込み待ちのファイル数の上限
+    executor: concurrent.futures.Executor | None
+        読み込みに使う Executor. Noneのときは ProcessPoolExecutor を作成します.
+    include_existing: bool = True
+        Falseのとき, 開始時に既にあるファイルは読み込みません.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        callback: Callback,
+        on_error: ErrorCallback | None = None,
+        parser: Callable[[str], GCDData] = get_GCDData,
+        analyse: bool = True,
+        patterns: Iterable[str] = ("*",),
+        poll_interval: float = 1.0,
+        settle_time: float = 2.0,
+        max_workers: int = 4,
+        max_queue: int = 100,
+        executor: Executor | None = None,
+        include_existing: bool = True,
+    ) -> None:
+        self.directory = os.fspath(directory)
+        self.callback = callback
+        self.on_error = on_error
+        self.parser = parser
+        self.analyse = analyse
+        self.patterns = tuple(patterns)
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = executor
+        self.include_existing = include_existing
+
+        self.processed = 0
+        self.failed = 0
+        # パス => ((大きさ, 更新時刻), 最初に検出した時刻, 最後に変化した時刻)
+        self._pending: dict[str, tuple[tuple[int, int], float, float]] = {}
+        # パス => 取り込んだときの (大きさ, 更新時刻)
+        self._seen: dict[str, tuple[int, int]] = {}
+        self._queue: asyncio.Queue | None = None
+        self._stopping: asyncio.Event | None = None
+        self._started = False
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        読み込み待ちのファイル数
+        """
+        return 0 if self._queue is None else self._queue.qsize()
+
+    @property
+    def pending(self) -> int:
+        """
+        書き込み完了を待っているファイル数
+        """
+        return len(self._pending)
+
+    def stop(self):
+        """
+        監視を止めます. 待ち行列に残っているファイルは読み込んでから `run` が終わります.
+        """
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def run(self):
+        """
+        `stop` が呼ばれるまでディレクトリを監視します.
+        """
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._stopping = asyncio.Event()
+        executor = self.executor
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        workers = [
+            asyncio.create_task(self._work(executor)) for _ in range(self.max_workers)
+        ]
+        try:
+            while not self._stopping.is_set():
+                try:
+                    await self.scan()
+                except OSError as e:
+                    # 共有ディレクトリが一時的に見えなくなっても監視は続ける
+                    logger.warning("failed to scan %s: %s", self.directory, e)
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(), timeout=self.poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            await self._queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if self.executor is None:
+                executor.shutdown()
+
+    async def scan(self):
+        """
+        ディレクトリを1度走査し, 書き込みが終わったファイルを待ち行列に入れます.
+        待ち行列が一杯のときは空くまで待ちます.
+        """
+        loop = asyncio.get_running_loop()
+        files = await loop.run_in_executor(None, self._list_files)
+        now = time.monotonic()
+
+        if not self._started:
+            self._started = True
+            if not self.include_existing:
+                self._seen.update(files)
+                return
+
+        for path, signature in files.items():
+            if self._seen.get(path) == signature:
+                continue
+            if path not in self._pending:
+                self._pending[path] = (signature, now, now)
+                continue
+            previous, first_seen, last_change = self._pending[path]
+            if previous != signature:
+                self._pending[path] = (signature, first_seen, now)
+            elif now - last_change >= self.settle_time:
+                del self._pending[path]
+                self._seen[path] = signature
+                await self._queue.put((path, first_seen))
+
+        # 消えたファイルは忘れる. 同じ名前で再び現れたときは新しいファイルとして扱う
+        for path in self._pending.keys() - files.keys():
+            del self._pending[path]
+        for path in self._seen.keys() - files.keys():
+            del self._seen[path]
+
+    def _list_files(self) -> dict[str, tuple[int, int]]:
+        files = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if not any(fnmatch.fnmatch(entry.name, p) for p in self.patterns):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # 走査中に名前が変わった・削除されたファイルは次の走査で扱う
+                    continue
+                files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    async def _work(self, executor: Executor):
+        loop = asyncio.get_running_loop()
+        while True:
+            path, first_seen = await self._queue.get()
+            try:
+                queue_depth = self._queue.qsize()
+                try:
+                    data, analyser, parse_seconds = await loop.run_in_executor(
+                        executor, _ingest, path, self.parser, self.analyse
+                    )
+                except Exception as e:
+                    self.failed += 1
+                    await self._notify_error(path, e)
+                    continue
+                self.processed += 1
+                result = IngestResult(
+                    path=path,
+                    data=data,
+                    analyser=analyser,
+                    parse_seconds=parse_seconds,
+                    latency=time.monotonic() - first_seen,
+                    queue_depth=queue_depth,
+                )
+                try:
+                    await _call(self.callback, result)
+                except Exception:
+                    logger.exception("callback failed for %s", path)
+            finally:
+                self._queue.task_done()
+
+    async def _notify_error(self, path: str, error: BaseException):
+        if self.on_error is None:
+            logger.warning("failed to ingest %s: %s", path, error)
+            return
+        try:
+            await _call(self.on_error, path, error)
+        except Exception:
+            logger.exception("on_error failed for %s", path)
+
+
+def _ingest(
+    path: str, parser: Callable[[str], GCDData], analyse: bool
+) -> tuple[GCDData, GCDAnalyser | None, float]:
+    started = time.perf_counter()
+    data = parser(path)
+    analyser = GCDAnalyser(data) if analyse else None
+    return data, analyser, time.perf_counter() - started
+
+
+async def _call(function, *args):
+    result = function(*args)
+    if inspect.isawaitable(result):
+        await result
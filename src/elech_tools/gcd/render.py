@@ -0,0 +1,254 @@
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Literal, Mapping
+
+from matplotlib import rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ..utils import file_stem, ordinal
+from .analyser import GCDAnalyser
+from .data import GCDData, get_GCDData
+
+FigureKind = Literal["charge_discharge", "capacity", "potential"]
+Source = str | os.PathLike | GCDData | GCDAnalyser
+
+
+@dataclass
+class RenderResult:
+    """
+    1枚の図の描画結果です.
+
+    source: 描画元の名前. 出力ファイル名の前半に使います.
+    figure: 図の種類
+    paths: 書き出したファイルのパス. 途中の形式で失敗したときは,
+        それまでに書き出したファイルのパスが残ります.
+    seconds: 解析・描画・書き出しにかかった時間 [s]
+    error: 失敗したときの例外の内容. 成功したときはNone
+    """
+
+    source: str
+    figure: FigureKind
+    paths: list[str]
+    seconds: float
+    error: str | None = None
+
+
+def render_figures(
+    sources: Iterable[Source] | Mapping[str, Source],
+    output_dir: str | os.PathLike,
+    figures: Iterable[FigureKind] = ("charge_discharge", "capacity", "potential"),
+    cycles: int = 2,
+    formats: Iterable[str] = ("png",),
+    decimate: int = 1,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+) -> list[RenderResult]:
+    """
+    複数の測定データについて、定型の図をプロセスプールで並列に描画します.
+    描画はAggバックエンドで行うため、ディスプレイのない環境でも動作します.
+    読み込みや描画に失敗したソースがあっても他のソースの描画は続け,
+    失敗は RenderResult.error に記録します.
+
+    ----------
+    Parameters
+    sources: Iterable[str | os.PathLike | GCDData | GCDAnalyser] | Mapping[str, ...]
+        ファイルパス、GCDData、GCDAnalyserのいずれか.
+        ファイルパスはワーカープロセス内で `get_GCDData` により読み込みます.
+        Mappingのときはキーをソース名にします. それ以外はファイル名(拡張子なし)を
+        ソース名にし, ファイルパスが無いときは sources 内の順番を使います.
+        同じソース名が複数あるときは `_{順番}` を付けて区別します.
+    output_dir: str | os.PathLike
+        書き出し先のディレクトリ. 存在しない場合は作成します.
+        ファイル名は `{ソース名}_{図の種類}.{拡張子}` です.
+    figures: Iterable[Literal["charge_discharge", "capacity", "potential"]]
+        描画する図の種類です.
+        charge_discharge => 最初の `cycles` サイクルの充放電曲線の重ね描き
+        capacity => サイクルごとの放電容量
+        potential => 時間-電位
+    cycles: int = 2
+        charge_discharge で重ね描きするサイクル数です.
+    formats: Iterable[str] = ("png",)
+        書き出すファイル形式です. "png", "svg" など.
+    decimate: int = 1
+        プロットの間引き間隔です. 1以上を指定します.
+    max_workers: int | None = None
+        プロセス数です. Noneのときは `os.cpu_count()` になります.
+    executor: concurrent.futures.Executor | None
+        描画に使う Executor. Noneのときは ProcessPoolExecutor を作成します.
+        matplotlib の数式描画はスレッドセーフではないため,
+        ThreadPoolExecutor を使う場合はスレッド数を1にしてください.
+
+    Returns
+    list[RenderResult]
+        sources の順に、各図の描画結果を並べたリスト
+    """
+    if decimate < 1:
+        raise ValueError(f"decimate must be 1 or greater, but {decimate} was given.")
+    output_dir = os.fspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    figures = tuple(figures)
+    formats = tuple(formats)
+    if isinstance(sources, Mapping):
+        names = [str(name) for name in sources.keys()]
+        sources = list(sources.values())
+    else:
+        sources = list(sources)
+        names = _unique_names([_source_name(s, i) for i, s in enumerate(sources)])
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [
+            executor.submit(
+                _render_source,
+                source,
+                name,
+                output_dir,
+                figures,
+                cycles,
+                formats,
+                decimate,
+            )
+            for source, name in zip(sources, names)
+        ]
+        results: list[RenderResult] = []
+        for future, name in zip(futures, names):
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                # ワーカーへの受け渡しなど, _render_source の外での失敗
+                results.extend(_failed(name, figures, 0.0, e))
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return results
+
+
+def _render_source(
+    source: Source,
+    name: str,
+    output_dir: str,
+    figures: tuple[FigureKind, ...],
+    cycles: int,
+    formats: tuple[str, ...],
+    decimate: int,
+) -> list[RenderResult]:
+    started = time.perf_counter()
+    try:
+        analyser = _to_analyser(source)
+    except Exception as e:
+        return _failed(name, figures, time.perf_counter() - started, e)
+    # 読み込みにかかった時間は最初の図に含める
+    elapsed = time.perf_counter() - started
+
+    results = []
+    for figure in figures:
+        started = time.perf_counter()
+        paths = []
+        error = None
+        try:
+            fig = Figure()
+            FigureCanvasAgg(fig)
+            ax = fig.subplots()
+            _draw(analyser, ax, figure, cycles, decimate)
+            fig.tight_layout()
+
+            for fmt in formats:
+                path = os.path.join(output_dir, f"{name}_{figure}.{fmt}")
+                fig.savefig(path, format=fmt)
+                paths.append(path)
+        except Exception as e:
+            error = _describe(e)
+        elapsed += time.perf_counter() - started
+        results.append(
+            RenderResult(
+                source=name, figure=figure, paths=paths, seconds=elapsed, error=error
+            )
+        )
+        elapsed = 0.0
+    return results
+
+
+def _failed(
+    name: str, figures: tuple[FigureKind, ...], seconds: float, error: BaseException
+) -> list[RenderResult]:
+    return [
+        RenderResult(
+            source=name,
+            figure=figure,
+            paths=[],
+            seconds=seconds if i == 0 else 0.0,
+            error=_describe(error),
+        )
+        for i, figure in enumerate(figures)
+    ]
+
+
+def _describe(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def _source_name(source: Source, i: int) -> str:
+    if isinstance(source, GCDAnalyser):
+        file_path = source.data.file_path
+    elif isinstance(source, GCDData):
+        file_path = source.file_path
+    else:
+        file_path = source
+    return file_stem(file_path, default=str(i))
+
+
+def _unique_names(names: list[str]) -> list[str]:
+    """
+    重複する名前に `_{順番}` を付けて, 出力ファイルが上書きされないようにします.
+    """
+    duplicated = {name for name in names if names.count(name) > 1}
+    unique = []
+    used = set(names) - duplicated
+    for i, name in enumerate(names):
+        if name in duplicated:
+            name = f"{name}_{i}"
+            while name in used:
+                name = f"{name}_{i}"
+        used.add(name)
+        unique.append(name)
+    return unique
+
+
+def _to_analyser(source: Source) -> GCDAnalyser:
+    if isinstance(source, GCDAnalyser):
+        return source
+    if isinstance(source, GCDData):
+        return GCDAnalyser(source)
+    return GCDAnalyser(get_GCDData(file_path=os.fspath(source)))
+
+
+def _draw(analyser: GCDAnalyser, ax, figure: FigureKind, cycles: int, decimate: int):
+    if figure == "charge_discharge":
+        colors = rcParams["axes.prop_cycle"].by_key()["color"]
+        n = min(cycles, len(analyser._charges), len(analyser._discharges))
+        for i in range(n):
+            color = colors[i % len(colors)]
+            analyser.plot_charge_discharge(
+                ax=ax,
+                cycle=i + 1,
+                mode="Charge",
+                decimate=decimate,
+                label=ordinal(i + 1),
+                color=color,
+            )
+            analyser.plot_charge_discharge(
+                ax=ax, cycle=i + 1, mode="Discharge", decimate=decimate, color=color
+            )
+        if n > 0:
+            ax.legend()
+    elif figure == "capacity":
+        analyser.plot_capacity_by_cycle(ax=ax, mode="Discharge", marker="o")
+    elif figure == "potential":
+        analyser.plot_potential_by_time(ax=ax, time_unit="h", decimate=decimate)
+    else:
+        raise Exception(f"Unknown figure kind: {figure}")
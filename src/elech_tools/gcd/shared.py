@@ -0,0 +1,168 @@
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from ..base import DataValidationException
+from .analyser import GCDAnalyser
+from .data import GCDData
+
+MANIFEST = "manifest.json"
+
+
+def publish_GCDData(
+    data: GCDData,
+    directory: str | os.PathLike,
+    analyser: GCDAnalyser | None = None,
+) -> str:
+    """
+    GCDData とステップ表を, 列ごとの .npy ファイルとして書き出します.
+    書き出したディレクトリを `attach_GCDData` / `attach_GCDAnalyser` で
+    開くと, 各プロセスはメモリマップで同じデータを共有します.
+    /dev/shm などのメモリ上のファイルシステムを指定するとディスクを介しません.
+
+    同じディレクトリに再度書き出すと, 新しい名前のファイルを書いてから manifest を
+    置き換え, 古いファイルを削除します. 既存のファイルを上書き(切り詰め)しないため,
+    古いデータを開いているプロセスはそのまま古いデータを読み続けられます.
+
+    ----------
+    Parameters
+    data: GCDData
+    directory: str | os.PathLike
+        書き出し先のディレクトリ. 存在しない場合は作成します.
+    analyser: GCDAnalyser | None
+        作成済みの場合に指定すると, そのステップ表を書き出します.
+        Noneのときはここで作成します.
+
+    Return
+    str: 書き出したディレクトリ
+    """
+    directory = os.fspath(directory)
+    os.makedirs(directory, exist_ok=True)
+    if analyser is None:
+        step_table = GCDAnalyser.build_step_table(data.df)
+    else:
+        step_table = analyser.step_table
+
+    try:
+        previous = _read_manifest(directory)
+    except DataValidationException:
+        previous = None
+
+    # 書き出すたびに別の名前を使い, 開かれているファイルを上書きしない
+    token = uuid.uuid4().hex
+    manifest = {
+        "file_path": None if data.file_path is None else os.fspath(data.file_path),
+        "rows": len(data.df),
+        "columns": _save_frame(data.df, directory, f"data_{token}"),
+        "step_table": _save_frame(step_table, directory, f"steps_{token}"),
+    }
+    # manifest は最後に置き換え, 書き出し途中のファイルを開かないようにする
+    path = os.path.join(directory, MANIFEST)
+    with open(path + f".{token}.tmp", mode="wt", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False)
+    os.replace(path + f".{token}.tmp", path)
+
+    if previous is not None:
+        # 削除してもメモリマップ済みのプロセスはそのまま読める.
+        # 削除できない環境(Windowsでマップ中など)では残しておく
+        for spec in previous["columns"] + previous["step_table"]:
+            try:
+                os.remove(os.path.join(directory, spec["file"]))
+            except OSError:
+                pass
+    return directory
+
+
+def attach_GCDData(directory: str | os.PathLike) -> GCDData:
+    """
+    `publish_GCDData` で書き出したデータを読み取り専用で開きます.
+    数値・日時の列はメモリマップをそのまま参照するため, コピーされません.
+    mode列は文字列型に復元するため, 行数分のポインタ配列を作成します.
+
+    ----------
+    Parameters
+    directory: str | os.PathLike
+
+    Return
+    GCDData
+    """
+    manifest, df, _ = _attach(directory, step_table=False)
+    return GCDData.from_dataframe(df, file_path=manifest["file_path"])
+
+
+def attach_GCDAnalyser(directory: str | os.PathLike) -> GCDAnalyser:
+    """
+    `publish_GCDData` で書き出したデータを読み取り専用で開き,
+    書き出し済みのステップ表から GCDAnalyser を作成します.
+
+    ----------
+    Parameters
+    directory: str | os.PathLike
+
+    Return
+    GCDAnalyser
+    """
+    manifest, df, step_table = _attach(directory, step_table=True)
+    data = GCDData.from_dataframe(df, file_path=manifest["file_path"])
+    return GCDAnalyser(data, step_table=step_table)
+
+
+def _attach(
+    directory: str | os.PathLike, step_table: bool, retries: int = 3
+) -> tuple[dict, pd.DataFrame, pd.DataFrame | None]:
+    # manifest を読んだ直後に再度書き出されると古いファイルが消えているため,
+    # manifest を読み直して開き直す
+    for attempt in range(retries):
+        manifest = _read_manifest(directory)
+        try:
+            df = _load_frame(manifest["columns"], directory)
+            steps = None
+            if step_table:
+                steps = _load_frame(manifest["step_table"], directory)
+            return manifest, df, steps
+        except FileNotFoundError:
+            if attempt == retries - 1:
+                raise
+
+
+def _read_manifest(directory: str | os.PathLike) -> dict:
+    path = os.path.join(os.fspath(directory), MANIFEST)
+    if not os.path.exists(path):
+        raise DataValidationException(f"{path} does not exist")
+    with open(path, mode="rt", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _save_frame(df: pd.DataFrame, directory: str, prefix: str) -> list[dict]:
+    columns = []
+    for i, column in enumerate(df.columns):
+        spec = {"name": column, "file": f"{prefix}_{i}.npy"}
+        series = df[column]
+        if isinstance(series.dtype, pd.StringDtype):
+            # 文字列はカテゴリのコードとして保存する
+            categorical = pd.Categorical(series)
+            array = categorical.codes
+            spec["categories"] = categorical.categories.tolist()
+        else:
+            array = series.to_numpy()
+        np.save(os.path.join(directory, spec["file"]), array, allow_pickle=False)
+        columns.append(spec)
+    return columns
+
+
+def _load_frame(columns: list[dict], directory: str | os.PathLike) -> pd.DataFrame:
+    directory = os.fspath(directory)
+    arrays = {}
+    for spec in columns:
+        array = np.load(os.path.join(directory, spec["file"]), mmap_mode="r")
+        # np.memmap のままだと pandas の一部の処理で扱いが変わるため ndarray として参照する
+        array = array.view(np.ndarray)
+        if "categories" in spec:
+            array = pd.Categorical.from_codes(array, spec["categories"]).astype(
+                "string"
+            )
+        arrays[spec["name"]] = array
+    return pd.DataFrame(arrays, copy=False)
@@ -1 +1,3 @@
 from .ordinal import ordinal
+from .path import file_stem
+from .profiler import Profiler, StageRecord
@@ -0,0 +1,18 @@
+import os
+
+
+def file_stem(file_path: str | os.PathLike | None, default: str) -> str:
+    """
+    ファイルパスから拡張子を除いたファイル名を返します.
+    file_path がNoneのときは default を返します.
+
+    -----------
+    Parameters:
+        file_path: str | os.PathLike | None
+        default: str
+    Returns:
+        string: ファイル名(拡張子なし)
+    """
+    if file_path is None:
+        return default
+    return os.path.splitext(os.path.basename(os.fspath(file_path)))[0]
@@ -0,0 +1,150 @@
+import logging
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageRecord:
+    """
+    1ステージ分の計測結果です.
+
+    name: ステージ名
+    seconds: 経過時間 [s]
+    rows: 処理した行数. 不明な場合はNone
+    memory: 確保したメモリの増分 [byte]. 計測していない場合はNone
+    error: ステージ内で例外が発生した場合はその内容. 成功した場合はNone
+    """
+
+    name: str
+    seconds: float = 0.0
+    rows: int | None = None
+    memory: int | None = None
+    error: str | None = None
+
+
+class Profiler:
+    """
+    読み込み・解析の各ステージの経過時間, 処理行数, メモリ増分を記録します.
+
+    ----------
+    Parameters
+    callback: Callable[[StageRecord], None] | None
+        ステージが終わるたびに呼ばれる関数です. メトリクスの送信などに利用します.
+        callback で発生した例外はログに出力し, 計測対象の処理には伝えません.
+    trace_memory: bool = False
+        Trueのとき tracemalloc でメモリ増分を計測します.
+        tracemalloc が停止している場合は with文に入るときに開始し, 抜けるときに停止します.
+        tracemalloc は全ての割り当てを追跡するため処理が遅くなり,
+        計測した経過時間は実際より大きくなります. 経過時間を見るときは無効にしてください.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[StageRecord], None] | None = None,
+        trace_memory: bool = False,
+    ) -> None:
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.records: list[StageRecord] = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def stage(self, name: str, rows: int | None = None) -> "_Stage":
+        """
+        with文でステージを計測します. `as` で受け取った StageRecord の
+        rows を書き換えると, 処理行数として記録されます.
+
+        ----------
+        Parameters
+        name: str
+            ステージ名
+        rows: int | None
+            処理行数. 事前に分かる場合に指定します.
+        """
+        return _Stage(self, StageRecord(name=name, rows=rows))
+
+    def report(self) -> pd.DataFrame:
+        """
+        記録したステージを DataFrame で返します.
+        列は name, seconds, rows, memory, error です.
+        """
+        return pd.DataFrame(
+            [asdict(record) for record in self.records],
+            columns=["name", "seconds", "rows", "memory", "error"],
+        ).astype({"rows": "Int64", "memory": "Int64"})
+
+    def _record(self, record: StageRecord):
+        self.records.append(record)
+        logger.debug(
+            "%s: %.6f s, rows=%s, memory=%s, error=%s",
+            record.name,
+            record.seconds,
+            record.rows,
+            record.memory,
+            record.error,
+        )
+        if self.callback is not None:
+            # 計測の失敗で読み込み・解析の結果が変わらないようにする
+            try:
+                self.callback(record)
+            except Exception:
+                logger.exception("profiler callback failed for %s", record.name)
+
+
+class _Stage:
+    def __init__(self, profiler: Profiler, record: StageRecord) -> None:
+        self.profiler = profiler
+        self.record = record
+
+    def __enter__(self) -> StageRecord:
+        self._memory = self._traced_memory()
+        self._started = time.perf_counter()
+        return self.record
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.record.seconds = time.perf_counter() - self._started
+        if self._memory is not None:
+            self.record.memory = self._traced_memory() - self._memory
+        if exc is not None:
+            self.record.error = f"{exc_type.__name__}: {exc}"
+        self.profiler._record(self.record)
+
+    def _traced_memory(self) -> int | None:
+        if self.profiler.trace_memory and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        return None
+
+
+class _NullStage:
+    """
+    プロファイラが無効なときに使う, 何もしないステージです.
+    状態を共有しないよう, `as` で受け取る StageRecord は毎回新しく作成します.
+    """
+
+    def __enter__(self) -> StageRecord:
+        return StageRecord(name="")
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_STAGE = _NullStage()
@@ -4,7 +4,23 @@ import pandas as pd
 
 class Search:
     def __init__(self, arrayLike):
-        self.series: pd.Series = self.to_series(arrayLike)
+        self.values: np.ndarray
+        self.index: pd.Index | None
+        self.values, self.index = self.to_arrays(arrayLike)
+        # 昇順に並んでいれば並べ替えを省略する
+        self.is_sorted: bool = bool(np.all(self.values[1:] >= self.values[:-1]))
+        self.order: np.ndarray | None = None
+        self._sorted_values: np.ndarray = self.values
+
+    def to_arrays(self, arrayLike) -> tuple[np.ndarray, pd.Index | None]:
+        """
+        探索する値の配列と, 返り値に使うindexを返します.
+        1次元のnumpy.ndarrayはそのまま参照し, indexは位置(None)とします.
+        """
+        if isinstance(arrayLike, np.ndarray) and arrayLike.ndim == 1:
+            return arrayLike, None
+        series = self.to_series(arrayLike)
+        return series.to_numpy(), series.index
 
     def to_series(self, arrayLike) -> pd.Series:
         if isinstance(arrayLike, np.ndarray):
@@ -18,12 +34,29 @@ class Search:
         else:
             return pd.Series(arrayLike)
 
+    @property
+    def series(self) -> pd.Series:
+        """
+        探索順(sort後は昇順)に並べた値のSeriesです.
+        """
+        positions = np.arange(len(self.values)) if self.order is None else self.order
+        index = positions if self.index is None else self.index[positions]
+        return pd.Series(self._sorted_values, index=index)
+
     def sort(self):
-        self.series = self.series.sort_values(kind="mergesort", ignore_index=False)
+        """
+        値の昇順に探索できるよう, 並べ替えの順序を計算します.
+        既に昇順に並んでいる場合や, 計算済みの場合は何もしません.
+        """
+        if not self.is_sorted and self.order is None:
+            self.order = np.argsort(self.values, kind="mergesort")
+            self._sorted_values = self.values[self.order]
         return self
 
     def get_nearest_index(self, value) -> pd.Index | pd.MultiIndex:
-        array = self.series.values
+        # 昇順でなければ, ここで並べ替えの順序を計算する
+        self.sort()
+        array = self._sorted_values
         index = array.searchsorted(value, side="left")
 
         if index == 0:
@@ -38,7 +71,11 @@ class Search:
             if np.abs(array[index - 1] - value) < np.abs(array[index] - value):
                 index = index - 1
 
-        return self.series.index[index]
+        if self.order is not None:
+            index = self.order[index]
+        if self.index is None:
+            return int(index)
+        return self.index[index]
 
 
 class SearchDateTime(Search):
@@ -46,11 +83,17 @@ class SearchDateTime(Search):
     datetimeを対象にした検索
     """
 
+    def to_arrays(self, arrayLike) -> tuple[np.ndarray, pd.Index | None]:
+        series = self.to_series(arrayLike)
+        return series.to_numpy(), series.index
+
     def to_series(self, arrayLike) -> pd.Series:
         series = super().to_series(arrayLike)
         series = pd.to_datetime(series)
-        series = series.apply(lambda t: t.timestamp())
-        return series
+        if series.dt.tz is not None:
+            series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+        # UNIX時間 [s] に変換する
+        return (series - pd.Timestamp(0)) / pd.Timedelta(seconds=1)
 
     def get_nearest_index(self, value):
         timestamp: pd.Timestamp = pd.to_datetime(value)
@@ -0,0 +1,72 @@
+import pandas as pd
+
+from elech_tools import GCDData
+
+
+def make_data(
+    cycles: int = 2,
+    points: int = 4,
+    started_at: str = "2023-09-08 10:00:00",
+    file_path: str = "cell.csv",
+    fade: float = 0.0,
+) -> GCDData:
+    """
+    Rest, Charge, Discharge の3ステップを cycles 回繰り返す GCDData を作成します.
+    容量はサイクルごとに fade の割合だけ減少します.
+    """
+    modes = ["Rest", "Charge", "Discharge"]
+    rows = []
+    for cycle in range(1, cycles + 1):
+        scale = (1 - fade) ** (cycle - 1)
+        for step, mode in enumerate(modes, start=1):
+            for i in range(points):
+                potential = 3.0 + (i * 0.1 if mode != "Discharge" else -i * 0.1)
+                capacity = 0.0 if mode == "Rest" else i * 0.1 * scale
+                rows.append((len(rows), potential, capacity, cycle, step, mode))
+    df = pd.DataFrame(
+        rows,
+        columns=[
+            "time [sec]",
+            "potential [V]",
+            "capacity [mAh]",
+            "cycle",
+            "step",
+            "mode",
+        ],
+    )
+    df["capacity [mAh g-1]"] = df["capacity [mAh]"] * 10
+    df["datetime"] = pd.Timestamp(started_at) + pd.to_timedelta(
+        df["time [sec]"], unit="s"
+    )
+    df = df.astype(
+        {
+            "time [sec]": "float64",
+            "datetime": "datetime64[ms]",
+            "cycle": "int32",
+            "step": "int32",
+            "mode": "string",
+        }
+    )
+    return GCDData.from_dataframe(df, file_path=file_path)
+
+
+SD8_HEADER = (
+    "測定開始日時,2023/09/08 10:00:00\n"
+    '"時間","電圧","電流","電力","Ah(Step)","Ah/g(Step)","Wh","Wh/g",'
+    '"温度","外部","サイクル","ステップ","モード"\n'
+    "sec,V,A,W,Ah,Ah/g,Wh,Wh/g,C,V,,,\n"
+)
+
+
+def write_sd8(path, rows):
+    """
+    SD8 形式のファイルを書き出します. rows は
+    (時間, 電圧, 容量, サイクル, ステップ, モード) のタプルのリストです.
+    """
+    with open(path, mode="wt", encoding="shift_jis") as file:
+        file.write(SD8_HEADER)
+        for time, potential, capacity, cycle, step, mode in rows:
+            file.write(
+                f"{time},{potential},0,0,{capacity},{capacity * 10},"
+                f"0,0,0,0,{cycle},{step},{mode}\n"
+            )
@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from elech_tools import GCDAnalyser
+from elech_tools.gcd.features import CycleFeatureExtractor
+
+from .helpers import make_data
+
+
+class TestCycleFeatureExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = CycleFeatureExtractor(
+            [
+                GCDAnalyser(make_data(cycles=5, fade=0.1, file_path="a.csv")),
+                GCDAnalyser(make_data(cycles=3, fade=0.0, file_path="b.csv")),
+            ]
+        )
+
+    def test_capacities(self):
+        capacities = self.extractor.capacities
+        self.assertEqual(capacities.shape, (2, 5))
+        np.testing.assert_allclose(capacities[0], 0.3 * 0.9 ** np.arange(5))
+        np.testing.assert_allclose(capacities[1, :3], [0.3] * 3)
+        self.assertTrue(np.isnan(capacities[1, 3:]).all())
+
+    def test_fade_slope(self):
+        slope = self.extractor.fade_slope(1, 3)
+        expected = np.polyfit([1, 2, 3], 0.3 * 0.9 ** np.arange(3), 1)[0]
+        self.assertAlmostEqual(slope[0], expected)
+        self.assertAlmostEqual(slope[1], 0.0)
+
+    def test_delta_q_variance(self):
+        variance = self.extractor.delta_q_variance(1, 3, points=11)
+        # 電位 3.0 -> 2.7 V で容量が 0 -> 0.3 * scale となる
+        grid_q = np.linspace(0.3, 0.0, 11)
+        expected = np.var(grid_q * 0.81 - grid_q)
+        self.assertAlmostEqual(variance[0], expected)
+        self.assertAlmostEqual(variance[1], 0.0)
+
+    def test_extract(self):
+        features = self.extractor.extract(
+            capacity_cycles=(1, 5), delta_q_cycles=(1, 5), fade_cycles=(1, 5)
+        )
+        self.assertEqual(list(features.index), ["a", "b"])
+        self.assertEqual(
+            list(features.columns),
+            ["capacity_1", "capacity_5", "delta_q_variance_1_5", "fade_slope_1_5"],
+        )
+        self.assertTrue(np.isnan(features.at["b", "capacity_5"]))
+        self.assertTrue(np.isnan(features.at["b", "delta_q_variance_1_5"]))
+        self.assertFalse(np.isnan(features.at["b", "fade_slope_1_5"]))
+
+    def test_invalid_cycle(self):
+        with self.assertRaises(ValueError):
+            self.extractor.capacity(0)
+        with self.assertRaises(ValueError):
+            self.extractor.fade_slope(0, 3)
+        with self.assertRaises(ValueError):
+            self.extractor.delta_q_variance(0, 3)
+
+    def test_capacity_is_copy(self):
+        capacity = self.extractor.capacity(1)
+        capacity[:] = 0.0
+        np.testing.assert_allclose(self.extractor.capacity(1), [0.3, 0.3])
+        with self.assertRaises(ValueError):
+            self.extractor.capacities[:, 0] = 0.0
@@ -0,0 +1,148 @@
+import asyncio
+import contextlib
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from elech_tools.gcd.ingest import IngestService
+
+from .helpers import write_sd8
+
+ROWS = [
+    (
+        i,
+        3.0 + i * 0.1,
+        i * 0.1,
+        1,
+        1 if i < 4 else 2,
+        "Charge" if i < 4 else "Discharge",
+    )
+    for i in range(8)
+]
+
+
+class TestIngestService(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.tmpdir.cleanup()
+
+    def run_service(self, scenario, directory=None, **kwargs):
+        results = []
+        errors = []
+
+        async def on_error(path, error):
+            errors.append(path)
+
+        async def main():
+            service = IngestService(
+                directory or self.tmpdir.name,
+                results.append,
+                on_error=on_error,
+                poll_interval=0.01,
+                settle_time=0.05,
+                max_workers=2,
+                executor=self.executor,
+                **kwargs,
+            )
+            task = asyncio.create_task(service.run())
+            await scenario(service, results)
+            service.stop()
+            await asyncio.wait_for(task, timeout=5)
+            return service
+
+        return asyncio.run(main()), results, errors
+
+    async def wait_for(self, condition):
+        for _ in range(500):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("timeout")
+
+    def test_ingest(self):
+        path = os.path.join(self.tmpdir.name, "cell.csv")
+
+        async def scenario(service, results):
+            write_sd8(path, ROWS)
+            await self.wait_for(lambda: len(results) == 1)
+
+        service, results, errors = self.run_service(scenario)
+        self.assertEqual(errors, [])
+        self.assertEqual(service.processed, 1)
+        result = results[0]
+        self.assertEqual(result.path, path)
+        self.assertEqual(len(result.data.df), 8)
+        self.assertEqual(result.analyser.get_index(1, "Discharge"), (1, 2))
+        self.assertGreaterEqual(result.latency, 0.05)
+        self.assertGreaterEqual(result.latency, result.parse_seconds)
+
+    def test_invalid_file(self):
+        path = os.path.join(self.tmpdir.name, "invalid.csv")
+        hidden = os.path.join(self.tmpdir.name, ".cell.csv")
+
+        async def scenario(service, results):
+            with open(path, mode="wt") as file:
+                file.write("not a measurement\n")
+            write_sd8(hidden, ROWS)
+            await self.wait_for(lambda: service.failed == 1)
+
+        service, results, errors = self.run_service(scenario)
+        self.assertEqual(errors, [path])
+        self.assertEqual(results, [])
+        self.assertEqual(service.queue_depth, 0)
+
+    def test_exclude_existing(self):
+        write_sd8(os.path.join(self.tmpdir.name, "old.csv"), ROWS)
+        path = os.path.join(self.tmpdir.name, "new.csv")
+
+        async def scenario(service, results):
+            await asyncio.sleep(0.05)
+            write_sd8(path, ROWS)
+            await self.wait_for(lambda: len(results) == 1)
+            await asyncio.sleep(0.1)
+
+        _, results, _ = self.run_service(scenario, include_existing=False)
+        self.assertEqual([result.path for result in results], [path])
+
+    def test_forget_removed_files(self):
+        path = os.path.join(self.tmpdir.name, "cell.csv")
+        write_sd8(path, ROWS)
+
+        async def scenario(service, results):
+            await self.wait_for(lambda: len(results) == 1)
+            os.remove(path)
+            await self.wait_for(lambda: path not in service._seen)
+
+        service, _, _ = self.run_service(scenario)
+        self.assertEqual(service._seen, {})
+
+    def test_file_removed_while_listing(self):
+        path = os.path.join(self.tmpdir.name, "renamed.tmp")
+        write_sd8(path, ROWS)
+        entries = list(os.scandir(self.tmpdir.name))
+        os.remove(path)
+
+        service = IngestService(self.tmpdir.name, print)
+        with mock.patch("os.scandir", return_value=contextlib.nullcontext(entries)):
+            self.assertEqual(service._list_files(), {})
+
+    def test_directory_unavailable(self):
+        directory = os.path.join(self.tmpdir.name, "share")
+        path = os.path.join(directory, "cell.csv")
+
+        async def scenario(service, results):
+            # 共有ディレクトリが見えない間も監視を続ける
+            await asyncio.sleep(0.05)
+            os.mkdir(directory)
+            write_sd8(path, ROWS)
+            await self.wait_for(lambda: len(results) == 1)
+
+        with self.assertLogs("elech_tools.gcd.ingest", level="WARNING"):
+            _, results, _ = self.run_service(scenario, directory=directory)
+        self.assertEqual([result.path for result in results], [path])
@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from elech_tools import GCDAnalyser, GCDData
+from elech_tools.base import DataValidationException
+from elech_tools.gcd.data import SD8Data
+
+from .helpers import make_data
+
+
+class TestMerge(unittest.TestCase):
+    def test_merge(self):
+        first = make_data(cycles=2, started_at="2023-09-08 10:00:00", file_path="a")
+        second = make_data(cycles=1, started_at="2023-09-08 11:00:00", file_path="b")
+        # 測定開始日時の順に並べ替えられる
+        merged = GCDData.merge([second, first])
+        df = merged.df
+
+        self.assertEqual(merged.file_path, "a")
+        self.assertEqual(len(df), len(first.df) + len(second.df))
+        self.assertEqual(df["cycle"].tolist()[-12:], [3] * 12)
+        # サイクルごとの step はそのまま
+        self.assertEqual(df["step"].tolist()[-12:], [1] * 4 + [2] * 4 + [3] * 4)
+        self.assertEqual(df["time [sec]"].iat[len(first.df)], 3600.0)
+        self.assertTrue(df["datetime"].is_monotonic_increasing)
+        self.assertEqual(df["mode"].dtype, "string")
+
+        analyser = GCDAnalyser(merged)
+        np.testing.assert_array_equal(
+            analyser.get_df(3, "Discharge")["potential [V]"],
+            second.df.loc[second.df["mode"] == "Discharge", "potential [V]"],
+        )
+
+    def test_merge_global_steps(self):
+        first = make_data(cycles=2, started_at="2023-09-08 10:00:00")
+        second = make_data(cycles=2, started_at="2023-09-08 11:00:00")
+        for data in (first, second):
+            # step をサイクルをまたいだ通し番号にする
+            data.df["step"] += (data.df["cycle"] - 1) * 3
+        df = GCDData.merge([first, second]).df
+        self.assertEqual(df["step"].tolist()[-12:], [10] * 4 + [11] * 4 + [12] * 4)
+        self.assertEqual(df["step"].nunique(), 12)
+
+    def test_merge_without_datetime(self):
+        first = make_data(cycles=1)
+        second = make_data(cycles=1)
+        second.df["datetime"] = np.datetime64("NaT", "ms")
+        df = GCDData.merge([first, second]).df
+        self.assertEqual(df["time [sec]"].iat[len(first.df)], 11.0)
+        self.assertEqual(df["cycle"].max(), 2)
+
+    def test_merge_first_time_offset(self):
+        first = make_data(cycles=1, started_at="2023-09-08 10:00:00")
+        second = make_data(cycles=1, started_at="2023-09-08 11:00:00")
+        # 2つ目のデータは測定開始から5秒後の点から始まる
+        second.df["time [sec]"] += 5.0
+        second.df["datetime"] += pd.Timedelta(seconds=5)
+        df = GCDData.merge([first, second]).df
+        self.assertEqual(df["time [sec]"].iat[len(first.df)], 3605.0)
+
+    def test_merge_overlap(self):
+        first = make_data(cycles=1, started_at="2023-09-08 10:00:00")
+        second = make_data(cycles=1, started_at="2023-09-08 10:00:00")
+        with self.assertRaises(DataValidationException):
+            GCDData.merge([first, second])
+
+        third = make_data(cycles=1, started_at="2023-09-08 10:00:05")
+        with self.assertRaises(DataValidationException):
+            GCDData.merge([first, third])
+
+    def test_merge_class(self):
+        first = make_data(cycles=1, started_at="2023-09-08 10:00:00")
+        second = make_data(cycles=1, started_at="2023-09-08 11:00:00")
+        self.assertIs(type(SD8Data.merge([first, second])), SD8Data)
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from elech_tools import GCDAnalyser, get_GCDData
+from elech_tools.base import DataValidationException
+from elech_tools.utils.profiler import NULL_STAGE, Profiler
+
+from .helpers import write_sd8
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "sd8.csv")
+        rows = []
+        for cycle in (1, 2):
+            for step, mode in ((1, "Charge"), (2, "Discharge")):
+                for i in range(5):
+                    time = len(rows)
+                    rows.append((time, 3.0 + i * 0.1, i * 0.1, cycle, step, mode))
+        write_sd8(self.path, rows)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_stage(self):
+        received = []
+        with Profiler(callback=received.append, trace_memory=True) as profiler:
+            with profiler.stage("outer") as stage:
+                with profiler.stage("inner", rows=3):
+                    [0] * 1000
+                stage.rows = 5
+        self.assertEqual([r.name for r in profiler.records], ["inner", "outer"])
+        self.assertEqual(received, profiler.records)
+        self.assertEqual(profiler.records[0].rows, 3)
+        self.assertEqual(profiler.records[1].rows, 5)
+        self.assertIsNotNone(profiler.records[1].memory)
+        self.assertGreaterEqual(profiler.records[1].seconds, 0.0)
+
+    def test_no_memory(self):
+        profiler = Profiler()
+        with profiler.stage("stage"):
+            pass
+        self.assertEqual(len(profiler.records), 1)
+        self.assertIsNone(profiler.records[0].memory)
+
+        # tracemalloc は with文の間だけ動かす
+        profiler = Profiler(trace_memory=True)
+        self.assertFalse(tracemalloc.is_tracing())
+        with profiler:
+            self.assertTrue(tracemalloc.is_tracing())
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_failed_callback(self):
+        def callback(record):
+            raise ConnectionError("metrics server is down")
+
+        profiler = Profiler(callback=callback)
+        with self.assertLogs("elech_tools.utils.profiler", level="ERROR"):
+            data = get_GCDData(self.path, profiler=profiler)
+        self.assertEqual(type(data).__name__, "SD8Data")
+        self.assertEqual(len(profiler.records), 6)
+
+    def test_load_and_analyse(self):
+        with Profiler() as profiler:
+            data = get_GCDData(self.path, profiler=profiler)
+            GCDAnalyser(data)
+        report = profiler.report()
+        self.assertEqual(
+            list(report["name"]),
+            [
+                "SD8Data.header",
+                "SD8Data.read_csv",
+                "SD8Data.datetime",
+                "SD8Data.astype",
+                "SD8Data.load",
+                "SD8Data.validate",
+                "GCDAnalyser.index",
+            ],
+        )
+        self.assertTrue((report["rows"] == 20).iloc[1:].all())
+
+    def test_disabled(self):
+        data = get_GCDData(self.path)
+        self.assertIsNone(data.profiler)
+        self.assertEqual(len(GCDAnalyser(data).steps), 2)
+        # 無効なときのステージは状態を持たない
+        with NULL_STAGE as first, NULL_STAGE as second:
+            first.rows = 10
+        self.assertIsNot(first, second)
+        self.assertIsNone(second.rows)
+
+    def test_failed_stage(self):
+        profiler = Profiler(trace_memory=False)
+        with self.assertRaises(KeyError):
+            with profiler.stage("stage"):
+                raise KeyError("column")
+        self.assertEqual(profiler.records[0].error, "KeyError: 'column'")
+
+        path = os.path.join(self.tmpdir.name, "invalid.csv")
+        with open(path, mode="wt") as file:
+            file.write("not a measurement\n")
+        with self.assertRaises(DataValidationException):
+            get_GCDData(path, profiler=profiler)
+        report = profiler.report()
+        self.assertIn("error", report.columns)
+        loads = report[report["name"].str.endswith(".load")]
+        self.assertEqual(
+            list(loads["name"]),
+            ["SD8Data.load", "BiologicData.load", "HZ7000Data.load"],
+        )
+        self.assertTrue(loads["error"].notna().all())
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from elech_tools import GCDAnalyser
+from elech_tools.gcd.render import render_figures
+
+from .helpers import make_data
+
+
+def make_axes():
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    return fig.subplots()
+
+
+class TestRenderFigures(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.tmpdir.cleanup()
+
+    def render(self, sources, **kwargs):
+        return render_figures(
+            sources, self.tmpdir.name, executor=self.executor, **kwargs
+        )
+
+    def test_render_figures(self):
+        sources = [
+            make_data(cycles=3, file_path="a.csv"),
+            GCDAnalyser(make_data(cycles=2, file_path="b.csv")),
+        ]
+        results = self.render(sources, formats=("png", "svg"))
+
+        self.assertEqual(
+            [(result.source, result.figure) for result in results],
+            [
+                ("a", "charge_discharge"),
+                ("a", "capacity"),
+                ("a", "potential"),
+                ("b", "charge_discharge"),
+                ("b", "capacity"),
+                ("b", "potential"),
+            ],
+        )
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(len(result.paths), 2)
+            for path in result.paths:
+                self.assertTrue(os.path.exists(path))
+
+    def test_unique_names(self):
+        sources = [
+            make_data(file_path=os.path.join("ch1", "cell.csv")),
+            make_data(file_path=os.path.join("ch2", "cell.csv")),
+            make_data(file_path=None),
+        ]
+        results = self.render(sources, figures=("capacity",))
+        self.assertEqual(
+            [result.source for result in results], ["cell_0", "cell_1", "2"]
+        )
+        self.assertEqual(len({result.paths[0] for result in results}), 3)
+
+        results = self.render({"x": sources[0]}, figures=("capacity",))
+        self.assertEqual(
+            results[0].paths, [os.path.join(self.tmpdir.name, "x_capacity.png")]
+        )
+
+    def test_failed_source(self):
+        missing = os.path.join(self.tmpdir.name, "missing.csv")
+        results = self.render([missing, make_data()], figures=("capacity", "potential"))
+        self.assertEqual(len(results), 4)
+        for result in results[:2]:
+            self.assertEqual(result.source, "missing")
+            self.assertEqual(result.paths, [])
+            self.assertIn("DataValidationException", result.error)
+        for result in results[2:]:
+            self.assertIsNone(result.error)
+            self.assertTrue(os.path.exists(result.paths[0]))
+
+    def test_decimate(self):
+        analyser = GCDAnalyser(make_data(points=10))
+        ax = analyser.plot_charge_discharge(make_axes(), 1, "Discharge", decimate=3)
+        self.assertEqual(len(ax.lines[0].get_xdata()), 4)
+        ax = analyser.plot_potential_by_time(make_axes(), decimate=4)
+        self.assertEqual(len(ax.lines[0].get_xdata()), 15)
+
+        with self.assertRaises(ValueError):
+            analyser.plot_charge_discharge(make_axes(), 1, "Discharge", decimate=0)
+        with self.assertRaises(ValueError):
+            self.render([analyser], decimate=0)
+
+    def test_plot_capacity_by_cycle(self):
+        analyser = GCDAnalyser(make_data(cycles=3, fade=0.5))
+        ax = analyser.plot_capacity_by_cycle(make_axes())
+        self.assertEqual(list(ax.lines[0].get_xdata()), [1, 2, 3])
+        np.testing.assert_allclose(ax.lines[0].get_ydata(), [3.0, 1.5, 0.75])
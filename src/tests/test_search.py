@@ -1,10 +1,13 @@
 import datetime
 import unittest
 
+import numpy as np
 import pandas as pd
 
 from elech_tools.utils.search import Search, SearchDateTime
 
+from .helpers import make_data
+
 
 class TestSearch(unittest.TestCase):
     def test_get_nearest_index_int(self):
@@ -152,3 +155,58 @@ class TestSearchDateTime(unittest.TestCase):
         self.assertEqual(
             SearchDateTime(array.index).get_nearest_index("2023-09-08 13:10:01"), 3
         )
+
+
+class TestSearchCache(unittest.TestCase):
+    def test_ndarray_is_not_copied(self):
+        array = np.array([1.1, 2.2, 3.3, 4.4, 5.5])
+        search = Search(array)
+        self.assertIs(search.values, array)
+        self.assertTrue(search.is_sorted)
+        self.assertEqual(search.get_nearest_index(3.2), 2)
+        self.assertIsNone(search.order)
+
+    def test_unsorted_without_sort(self):
+        array = np.array([3.3, 2.2, 4.1, 6.6, 1.0])
+        search = Search(array)
+        self.assertFalse(search.is_sorted)
+        self.assertEqual(search.get_nearest_index(3.9), 2)
+        order = search.order
+        self.assertEqual(search.get_nearest_index(6.7), 3)
+        self.assertIs(search.order, order)
+
+    def test_data_search(self):
+        data = make_data()
+        search = data.search("potential [V]")
+        self.assertIs(data.search("potential [V]"), search)
+        self.assertEqual(
+            data.search("datetime").get_nearest_index("2023-09-08 10:00:02.4"), 2
+        )
+
+        data.df = data.df.iloc[::-1]
+        self.assertIsNot(data.search("potential [V]"), search)
+
+    def test_data_search_in_place_edit(self):
+        data = make_data()
+        search = data.search("capacity [mAh]")
+        data.df.iloc[5, data.df.columns.get_loc("capacity [mAh]")] = 999.0
+        self.assertIsNot(data.search("capacity [mAh]"), search)
+        self.assertEqual(data.search("capacity [mAh]").get_nearest_index(999), 5)
+
+        # 同じメモリ領域をその場で書き換えた場合は invalidate_search で作り直す
+        search = data.search("capacity [mAh]")
+        values = data.df["capacity [mAh]"].to_numpy()
+        values.flags.writeable = True
+        values[7] = 555.0
+        self.assertIs(data.search("capacity [mAh]"), search)
+        data.invalidate_search("capacity [mAh]")
+        self.assertEqual(data.search("capacity [mAh]").get_nearest_index(555), 7)
+
+    def test_invalidate_search(self):
+        data = make_data()
+        search = data.search("potential [V]")
+        data.search("capacity [mAh]")
+        data.invalidate_search("potential [V]")
+        self.assertIsNot(data.search("potential [V]"), search)
+        data.invalidate_search()
+        self.assertEqual(data._searches, {})
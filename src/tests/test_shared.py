@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from elech_tools import GCDAnalyser
+from elech_tools.base import DataValidationException
+from elech_tools.gcd.shared import attach_GCDAnalyser, attach_GCDData, publish_GCDData
+
+from .helpers import make_data
+
+
+class TestShared(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.data = make_data()
+        self.analyser = GCDAnalyser(self.data)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_attach_GCDData(self):
+        publish_GCDData(self.data, self.tmpdir.name)
+        attached = attach_GCDData(self.tmpdir.name)
+        pd.testing.assert_frame_equal(attached.df, self.data.df)
+        self.assertEqual(attached.file_path, "cell.csv")
+
+        potential = attached.df["potential [V]"].to_numpy()
+        self.assertFalse(potential.flags.writeable)
+        with self.assertRaises(ValueError):
+            attached.df.loc[0, "potential [V]"] = 0.0
+
+    def test_attach_GCDAnalyser(self):
+        publish_GCDData(self.data, self.tmpdir.name, analyser=self.analyser)
+        attached = attach_GCDAnalyser(self.tmpdir.name)
+        pd.testing.assert_frame_equal(attached.step_table, self.analyser.step_table)
+        self.assertEqual(attached.steps, self.analyser.steps)
+        np.testing.assert_array_equal(
+            attached.get_df(2, "Discharge")["potential [V]"],
+            self.analyser.get_df(2, "Discharge")["potential [V]"],
+        )
+
+    def test_publish_again(self):
+        publish_GCDData(self.data, self.tmpdir.name)
+        old = attach_GCDData(self.tmpdir.name)
+        old_files = set(os.listdir(self.tmpdir.name))
+
+        new_data = make_data(cycles=3)
+        publish_GCDData(new_data, self.tmpdir.name)
+        new = attach_GCDData(self.tmpdir.name)
+
+        # 古いデータを開いているプロセスはそのまま読める
+        pd.testing.assert_frame_equal(old.df, self.data.df)
+        pd.testing.assert_frame_equal(new.df, new_data.df)
+        self.assertEqual(
+            old_files & set(os.listdir(self.tmpdir.name)), {"manifest.json"}
+        )
+
+    def test_scattered_step(self):
+        # cycle 1 の Rest が Charge, Discharge の後にもう一度現れる
+        df = self.data.df.copy()
+        df.loc[8:11, "step"] = 1
+        df.loc[8:11, "mode"] = "Rest"
+        with self.assertRaises(DataValidationException):
+            GCDAnalyser.build_step_table(df)